@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import os
+import re
+from dataclasses import replace
 from pathlib import Path
 
 from src.ics import build_ics, Event
@@ -77,6 +80,10 @@ OUTFILES = {
     "london-stadium": "london-stadium.ics",
 }
 
+# Title keywords for the (C)/(O) heuristic (case-insensitive substring match)
+_CONCERT_RE = re.compile(r"tour|live|concert|festival|gig", re.I)
+_SPORT_RE = re.compile(r"match|vs| v |fixture|cup|league|nfl|boxing|rugby", re.I)
+
 
 def _prefix_for_source(source: Source, title: str) -> str:
     """
@@ -92,9 +99,9 @@ def _prefix_for_source(source: Source, title: str) -> str:
         return f"(F) {title}"
 
     # Stadium events: try to guess concert vs other from the title
-    t = (title or "").lower()
-    concertish = any(k in t for k in ["tour", "live", "concert", "festival", "gig"])
-    sportish = any(k in t for k in ["match", "vs", " v ", "fixture", "cup", "league", "nfl", "boxing", "rugby"])
+    t = title or ""
+    concertish = _CONCERT_RE.search(t) is not None
+    sportish = _SPORT_RE.search(t) is not None
     if concertish and not sportish:
         return f"(C) {title}"
     return f"(O) {title}"
@@ -109,31 +116,48 @@ def build() -> None:
     # Group into one calendar per stadium
     events_by_stadium: dict[str, list[Event]] = {k: [] for k in CALENDAR_NAMES.keys()}
 
+    # The same event can be listed by more than one source for a stadium
+    # (e.g. fixtur.es and the club's own events page); keep the first one.
+    seen_by_stadium: dict[str, set[tuple]] = {k: set() for k in CALENDAR_NAMES.keys()}
+
     for source, events in all_events_by_source.items():
         tag = source.stadium_tag
         if tag not in events_by_stadium:
             continue
 
+        seen = seen_by_stadium[tag]
         for e in events:
-            # Prefix title
-            e.title = _prefix_for_source(source, e.title)
-
-            # Ensure location is set (helps in Outlook)
-            if not e.location:
-                e.location = source.location
+            key = (
+                (e.title or "").strip().lower(),
+                e.start.replace(minute=0, second=0, microsecond=0),
+                e.location or source.location,
+            )
+            if key in seen:
+                continue
+            seen.add(key)
+
+            # Prefix title, and ensure location is set (helps in Outlook).
+            # Event is frozen, so build the final copy in one go.
+            e = replace(
+                e,
+                title=_prefix_for_source(source, e.title),
+                location=e.location or source.location,
+            )
 
             events_by_stadium[tag].append(e)
 
     # Write ICS files
     for tag, cal_name in CALENDAR_NAMES.items():
         outfile = OUTPUT_DIR / OUTFILES[tag]
-        events = sorted(events_by_stadium[tag], key=lambda e: e.start)
-
+        # build_ics sorts by start time itself
         ics_text = build_ics(
             calendar_name=cal_name,
-            events=events,
+            events=events_by_stadium[tag],
         )
-        outfile.write_text(ics_text, encoding="utf-8")
+        # Calendar clients poll these files: write aside, then swap in atomically
+        tmp = outfile.with_suffix(".ics.tmp")
+        tmp.write_bytes(ics_text.encode("utf-8"))
+        os.replace(tmp, outfile)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+import hashlib
+import json
+import os
+import re
+import sys
+
+from src.ics import Event
+
+if TYPE_CHECKING:
+    import requests
+
+# Kept out of output/, which is published as-is to GitHub Pages
+CACHE_DIR = Path(".cache")
+
+# Conditional-GET cache: per URL, the last ETag / Last-Modified we saw plus the
+# events each source parsed from that response (and the source location they were
+# parsed with), so an HTTP 304 can skip parsing.
+CACHE_PATH = CACHE_DIR / "http_cache.json"
+
+# Parsed events per source, keyed by the SHA-256 of the page body, for servers
+# that send no validators (or resend an identical body with a 200).
+# Files are <source_key(stadium_tag, name)>.<body_key>.json.
+PARSED_DIR = CACHE_DIR / "parsed"
+
+# Bump when the structure of the cache files changes
+CACHE_LAYOUT = 4
+
+
+def _code_hash() -> str:
+    h = hashlib.sha256()
+    for path in sorted(Path(__file__).parent.glob("*.py")):
+        h.update(path.name.encode("utf-8"))
+        h.update(path.read_bytes())
+    return h.hexdigest()[:16]
+
+
+# Any change to the code under src/ (parsers, event serialisation) drops events
+# cached by the old code, without anyone having to remember a bump
+CACHE_VERSION = f"{CACHE_LAYOUT}-{_code_hash()}"
+
+
+def load_cache(path: Path = CACHE_PATH) -> dict[str, dict[str, Any]]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+        return {}
+    entries = data.get("entries")
+    return entries if isinstance(entries, dict) else {}
+
+
+def save_cache(cache: dict[str, dict[str, Any]], path: Path = CACHE_PATH) -> None:
+    """
+    Persist the cache, atomically. Never raises: a cache that can't be written
+    only costs the next run a full fetch.
+    """
+    data = {"version": CACHE_VERSION, "entries": cache}
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"[WARN] Failed to write cache {path}: {e}", file=sys.stderr)
+
+
+def source_key(stadium_tag: str, name: str) -> str:
+    """
+    Identity of a Source in both caches. Hashed so it is safe as a file name and
+    distinct sources can never share (or glob-match) each other's entries.
+    """
+    return hashlib.sha256(f"{stadium_tag}|{name}".encode("utf-8")).hexdigest()
+
+
+def cached_get(
+    session: requests.Session,
+    url: str,
+    cache: dict[str, dict[str, Any]],
+    locations: dict[str, str],
+    timeout: float | tuple[float, float] = 60,
+    max_bytes: int | None = None,
+    revalidate: bool = True,
+) -> tuple[str, bool]:
+    """
+    GET a URL, revalidating against the cache when it holds events for every
+    source reading it (locations maps source_key -> current Source.location)
+    and each was parsed with that same location. revalidate=False always does
+    a full GET.
+    Returns (text, from_cache); on HTTP 304 text is "" and from_cache is True.
+    A (decoded) body larger than max_bytes raises ValueError.
+    Raises like session.get / raise_for_status.
+    """
+    entry = cache.get(url) or {}
+    events = entry.get("events")
+    headers: dict[str, str] = {}
+    if revalidate and isinstance(events, dict) and all(
+        isinstance(events.get(skey), dict) and events[skey].get("location") == loc
+        for skey, loc in locations.items()
+    ):
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    with session.get(url, headers=headers, timeout=timeout, stream=True) as r:
+        if r.status_code == 304 and headers:
+            r.content  # drain the (empty) body so the connection goes back to the pool
+            return "", True
+        r.raise_for_status()
+
+        chunks: list[bytes] = []
+        size = 0
+        for chunk in r.iter_content(chunk_size=64 * 1024):
+            size += len(chunk)
+            if max_bytes is not None and size > max_bytes:
+                raise ValueError(f"response body exceeds {max_bytes} bytes")
+            chunks.append(chunk)
+        # Same decoding as r.text, minus the charset sniffing for header-less responses
+        text = b"".join(chunks).decode(r.encoding or "utf-8", errors="replace")
+
+    # New body: remember its validators; events are filled in by store_events()
+    cache[url] = {
+        "etag": r.headers.get("ETag"),
+        "last_modified": r.headers.get("Last-Modified"),
+        "events": {},
+    }
+    return text, False
+
+
+def _event_to_json(e: Event) -> dict[str, Any]:
+    return {
+        "title": e.title,
+        "start": e.start.isoformat(),
+        "end": e.end.isoformat() if e.end else None,
+        "location": e.location,
+        "url": e.url,
+    }
+
+
+def _event_from_json(d: dict[str, Any]) -> Event:
+    return Event(
+        title=d["title"],
+        start=datetime.fromisoformat(d["start"]),
+        end=datetime.fromisoformat(d["end"]) if d.get("end") else None,
+        location=d["location"],
+        url=d["url"],
+    )
+
+
+def store_events(
+    cache: dict[str, dict[str, Any]], url: str, skey: str, location: str, events: list[Event]
+) -> None:
+    entry = cache.get(url)
+    if entry is not None:
+        entry.setdefault("events", {})[skey] = {
+            "location": location,
+            "events": [_event_to_json(e) for e in events],
+        }
+
+
+def cached_events(cache: dict[str, dict[str, Any]], url: str, skey: str) -> list[Event] | None:
+    """Events source skey parsed from the cached response for url, or None if unusable."""
+    entry = cache.get(url) or {}
+    try:
+        return [_event_from_json(d) for d in entry["events"][skey]["events"]]
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+# -----------------------------
+# Parsed-events cache (by body hash)
+# -----------------------------
+def body_key(html: str, location: str, url: str) -> str:
+    # location/url are part of the key: the parsers write them into the events
+    return hashlib.sha256(f"{CACHE_VERSION}|{location}|{url}|{html}".encode("utf-8")).hexdigest()
+
+
+def load_parsed(stadium_tag: str, name: str, key: str, root: Path = PARSED_DIR) -> list[Event] | None:
+    path = root / f"{source_key(stadium_tag, name)}.{key}.json"
+    try:
+        return [_event_from_json(d) for d in json.loads(path.read_text(encoding="utf-8"))]
+    except (OSError, KeyError, TypeError, ValueError):
+        return None
+
+
+def save_parsed(stadium_tag: str, name: str, key: str, events: list[Event], root: Path = PARSED_DIR) -> None:
+    """Never raises: a failed write only means this source is parsed again next run."""
+    stem = source_key(stadium_tag, name)
+    path = root / f"{stem}.{key}.json"
+    try:
+        root.mkdir(parents=True, exist_ok=True)
+
+        # Only the latest body is worth keeping for each source
+        old_re = re.compile(rf"{stem}\.[0-9a-f]{{64}}\.json")
+        for old in root.glob(f"{stem}.*.json"):
+            if old_re.fullmatch(old.name):
+                old.unlink(missing_ok=True)
+
+        path.write_text(json.dumps([_event_to_json(e) for e in events], ensure_ascii=False), encoding="utf-8")
+    except OSError as e:
+        print(f"[WARN] Failed to write cache {path}: {e}", file=sys.stderr)
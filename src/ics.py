@@ -1,10 +1,14 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 import hashlib
+import io
+import operator
+
+_ICS_ESCAPES = str.maketrans({"\\": "\\\\", "\n": "\\n", ",": "\\,", ";": "\\;"})
 
 def _ics_escape(s: str) -> str:
-    return (s or "").replace("\\", "\\\\").replace("\n", "\\n").replace(",", "\\,").replace(";", "\\;")
+    return (s or "").translate(_ICS_ESCAPES)
 
 def _dt_to_ics(dt: datetime) -> str:
     # Use UTC to avoid Outlook TZ quirks; Outlook renders in local time.
@@ -13,49 +17,58 @@ def _dt_to_ics(dt: datetime) -> str:
     dt_utc = dt.astimezone(timezone.utc)
     return dt_utc.strftime("%Y%m%dT%H%M%SZ")
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Event:
     title: str
     start: datetime
     end: datetime | None
     location: str
     url: str
+    # Derived from the fields above; computed once (use dataclasses.replace to change fields)
+    _uid: str = field(init=False, repr=False, compare=False)
 
-    @property
-    def uid(self) -> str:
+    def __post_init__(self) -> None:
         base = f"{self.title}|{self.start.isoformat()}|{self.location}|{self.url}"
         h = hashlib.sha1(base.encode("utf-8")).hexdigest()
-        return f"{h}@gorilla-stadium-calendars"
+        object.__setattr__(self, "_uid", f"{h}@gorilla-stadium-calendars")
+
+    @property
+    def uid(self) -> str:
+        return self._uid
+
+_START = operator.attrgetter("start")
 
 def build_ics(calendar_name: str, events: list[Event]) -> str:
     now = datetime.now(timezone.utc)
-    lines = [
-        "BEGIN:VCALENDAR",
-        "VERSION:2.0",
-        "PRODID:-//Gorilla Carts & Kiosks//Stadium Calendars//EN",
-        "CALSCALE:GREGORIAN",
-        "METHOD:PUBLISH",
-        f"X-WR-CALNAME:{_ics_escape(calendar_name)}",
-        "X-WR-TIMEZONE:Europe/London",
-    ]
-
-    for e in sorted(events, key=lambda x: x.start):
-        lines.extend([
-            "BEGIN:VEVENT",
-            f"UID:{e.uid}",
-            f"DTSTAMP:{_dt_to_ics(now)}",
-            f"DTSTART:{_dt_to_ics(e.start)}",
-        ])
+    # Same stamp for every event in this build
+    dtstamp = f"DTSTAMP:{_dt_to_ics(now)}\r\n"
+
+    buf = io.StringIO()
+    w = buf.write
+    w(
+        "BEGIN:VCALENDAR\r\n"
+        "VERSION:2.0\r\n"
+        "PRODID:-//Gorilla Carts & Kiosks//Stadium Calendars//EN\r\n"
+        "CALSCALE:GREGORIAN\r\n"
+        "METHOD:PUBLISH\r\n"
+        f"X-WR-CALNAME:{_ics_escape(calendar_name)}\r\n"
+        "X-WR-TIMEZONE:Europe/London\r\n"
+    )
+
+    for e in sorted(events, key=_START):
+        w("BEGIN:VEVENT\r\n")
+        w(f"UID:{e.uid}\r\n")
+        w(dtstamp)
+        w(f"DTSTART:{_dt_to_ics(e.start)}\r\n")
         if e.end:
-            lines.append(f"DTEND:{_dt_to_ics(e.end)}")
-        lines.extend([
-            f"SUMMARY:{_ics_escape(e.title)}",
-            f"LOCATION:{_ics_escape(e.location)}",
-        ])
+            w(f"DTEND:{_dt_to_ics(e.end)}\r\n")
+        w(f"SUMMARY:{_ics_escape(e.title)}\r\n")
+        w(f"LOCATION:{_ics_escape(e.location)}\r\n")
         if e.url:
-            lines.append(f"URL:{_ics_escape(e.url)}")
-            lines.append(f"DESCRIPTION:{_ics_escape(e.url)}")
-        lines.append("END:VEVENT")
+            url = _ics_escape(e.url)
+            w(f"URL:{url}\r\n")
+            w(f"DESCRIPTION:{url}\r\n")
+        w("END:VEVENT\r\n")
 
-    lines.append("END:VCALENDAR")
-    return "\r\n".join(lines) + "\r\n"
+    w("END:VCALENDAR\r\n")
+    return buf.getvalue()
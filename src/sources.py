@@ -1,21 +1,37 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Iterable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Iterable
 import json
 import re
-import time
 import sys
-from datetime import timedelta
-
-import requests
-from bs4 import BeautifulSoup
-from dateutil import parser as dtparser
+import threading
+from datetime import datetime, timedelta
 
+from src import httpcache
 from src.ics import Event
 
+try:
+    import orjson
+except ImportError:  # optional speed-up; stdlib json is fine
+    orjson = None
+
+if TYPE_CHECKING:
+    import requests
+
+
+def _json_loads(raw: str) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except ValueError:
+            # orjson is stricter (e.g. NaN, lone surrogates); let json have a go
+            pass
+    return json.loads(raw)
+
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Source:
     name: str
     url: str
@@ -31,38 +47,167 @@ HEADERS = {
 }
 
 
-def _get(url: str) -> str:
+# One pooled session for the whole build so repeat hosts (fixtur.es, arsenal.com)
+# reuse their TCP/TLS connections across the parallel fetches. Created on first
+# use so importing this module (e.g. just for Source) doesn't pull in requests.
+SESSION: requests.Session | None = None
+_SESSION_LOCK = threading.Lock()
+
+
+def _session() -> requests.Session:
+    global SESSION
+    with _SESSION_LOCK:
+        if SESSION is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            session = requests.Session()
+            session.headers.update(HEADERS)
+            adapter = HTTPAdapter(
+                pool_connections=8,
+                pool_maxsize=16,
+                max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504]),
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            SESSION = session
+        return SESSION
+
+
+# Upper bound on concurrent page downloads in fetch_events
+MAX_FETCH_WORKERS = 16
+# (connect, read) seconds: one hung socket shouldn't hold a worker for long
+FETCH_TIMEOUT = (10, 30)
+# Refuse pathological pages rather than buffer them
+MAX_PAGE_BYTES = 8 * 1024 * 1024
+
+
+def _get(
+    url: str, cache: dict[str, dict[str, Any]], locations: dict[str, str], revalidate: bool = True
+) -> tuple[str, bool]:
     """
     Fetch a URL but NEVER crash the whole build if a site is slow / blocks us.
-    Returns "" on failure so downstream parsers return [].
+    Retries are handled by the session's adapter.
+    Returns (html, from_cache): from_cache is True when the server says the page
+    is unchanged since the copy cached for the sources in locations (HTTP 304).
+    revalidate=False skips the conditional request and always downloads the page.
+    Returns ("", False) on failure so downstream parsers return [].
+    """
+    try:
+        return httpcache.cached_get(
+            _session(), url, cache, locations,
+            timeout=FETCH_TIMEOUT, max_bytes=MAX_PAGE_BYTES, revalidate=revalidate,
+        )
+    except Exception as e:
+        print(f"[WARN] Failed to fetch {url}: {e}", file=sys.stderr)
+        return "", False
+
+
+# -----------------------------
+# HTML parsing: one streaming pass per page (lxml target parser, no tree built)
+# -----------------------------
+@dataclass
+class ParsedDoc:
+    # Text of every <script type="application/ld+json">
+    jsonld_scripts: list[str] = field(default_factory=list)
+    # Visible text lines (stripped, non-empty, document order)
+    text_lines: list[str] = field(default_factory=list)
+    # Non-empty <img alt> values
+    img_alts: list[str] = field(default_factory=list)
+
+
+class _DocTarget:
+    """
+    Routes parser events into a ParsedDoc. Script/style/template contents are
+    kept out of text_lines; JSON-LD scripts are captured on their own.
     """
-    for attempt in range(2):  # simple retry once
-        try:
-            r = requests.get(url, headers=HEADERS, timeout=90)
-            r.raise_for_status()
-            return r.text
-        except Exception as e:
-            print(f"[WARN] Failed to fetch {url} (attempt {attempt+1}/2): {e}", file=sys.stderr)
-            if attempt == 0:
-                time.sleep(2)
-                continue
-            return ""
+
+    _SKIP = ("script", "style", "template")
+
+    def __init__(self) -> None:
+        self.doc = ParsedDoc()
+        self._text: list[str] = []
+        self._jsonld: list[str] | None = None
+        self._skip_depth = 0
+
+    def _flush(self) -> None:
+        if self._text:
+            for ln in "".join(self._text).split("\n"):
+                ln = ln.strip()
+                if ln:
+                    self.doc.text_lines.append(ln)
+            self._text = []
+
+    def start(self, tag: str, attrib: dict[str, str]) -> None:
+        self._flush()
+        if tag in self._SKIP:
+            self._skip_depth += 1
+            if tag == "script" and (attrib.get("type") or "").strip().lower() == "application/ld+json":
+                self._jsonld = []
+        elif tag == "img":
+            alt = (attrib.get("alt") or "").strip()
+            if alt:
+                self.doc.img_alts.append(alt)
+
+    def end(self, tag: str) -> None:
+        self._flush()
+        if tag in self._SKIP and self._skip_depth:
+            self._skip_depth -= 1
+        if tag == "script" and self._jsonld is not None:
+            self.doc.jsonld_scripts.append("".join(self._jsonld))
+            self._jsonld = None
+
+    def data(self, text: str) -> None:
+        if self._jsonld is not None:
+            self._jsonld.append(text)
+        elif not self._skip_depth:
+            self._text.append(text)
+
+    def close(self) -> ParsedDoc:
+        self._flush()
+        return self.doc
+
+
+def _parse_html_once(html: str) -> ParsedDoc:
+    import lxml.etree as ET
+
+    target = _DocTarget()
+    parser = ET.HTMLParser(target=target)
+    try:
+        parser.feed(html)
+        parser.close()
+    except ET.LxmlError:
+        # Broken / empty markup: keep whatever was collected so far
+        target.close()
+    return target.doc
 
 
 # -----------------------------
 # JSON-LD event extraction
 # -----------------------------
-def _events_from_jsonld(html: str, default_location: str) -> list[Event]:
-    soup = BeautifulSoup(html, "html.parser")
-    scripts = soup.find_all("script", type="application/ld+json")
+_JSONLD_MARKER_RE = re.compile(r"application/ld\+json", re.I)
+
+
+def _fast_parse(s: str) -> datetime:
+    # schema.org dates are nearly always ISO-8601; dateutil only as a fallback
+    try:
+        return datetime.fromisoformat(s.replace("Z", "+00:00"))
+    except ValueError:
+        from dateutil import parser as dtparser  # slow import, only needed here
+
+        return dtparser.parse(s)
+
+
+def _events_from_jsonld(doc: ParsedDoc, default_location: str) -> list[Event]:
     events: list[Event] = []
 
-    for s in scripts:
-        raw = s.get_text(strip=True)
+    for s in doc.jsonld_scripts:
+        raw = s.strip()
         if not raw:
             continue
         try:
-            data: Any = json.loads(raw)
+            data: Any = _json_loads(raw)
         except Exception:
             continue
 
@@ -101,7 +246,7 @@ def _events_from_jsonld(html: str, default_location: str) -> list[Event]:
                 loc = str(loc_obj.get("name") or loc).strip()
 
             try:
-                start_dt = dtparser.parse(start) if start else None
+                start_dt = _fast_parse(start) if start else None
             except Exception:
                 start_dt = None
             if not start_dt:
@@ -110,7 +255,7 @@ def _events_from_jsonld(html: str, default_location: str) -> list[Event]:
             end_dt = None
             if end:
                 try:
-                    end_dt = dtparser.parse(end)
+                    end_dt = _fast_parse(end)
                 except Exception:
                     end_dt = None
 
@@ -133,61 +278,71 @@ def _events_from_jsonld(html: str, default_location: str) -> list[Event]:
 _FIXTURES_DT_RE = re.compile(
     r"^\d{1,2}\s+[A-Za-z]{3}\s+\d{4}\s+\d{1,2}:\d{2}\s+[+-]\d{2}:\d{2}$"
 )
+# Competition hints, in priority order when several appear near one fixture
+_COMP_NAMES = ("Champions League", "League Cup", "FA Cup")
+_COMP_MAP = {c.lower(): c for c in _COMP_NAMES}
+_COMP_RE = re.compile("|".join(re.escape(c) for c in _COMP_NAMES), re.I)
+# The "Team - Team" line sits right after its datetime; don't look further than this
+_FIXTURES_GAME_WINDOW = 6
+_FIXTURES_GAME_SEP = " - "
+# Default duration so Outlook shows a block
+_FIXTURES_DURATION = timedelta(hours=2, minutes=30)
+# strptime equivalent of _FIXTURES_DT_RE, e.g. "7 Sep 2025 12:00 +01:00"
+_FIXTURES_FMT = "%d %b %Y %H:%M %z"
+
+
+def _parse_fixture_dt(dt_str: str) -> datetime:
+    try:
+        return datetime.strptime(dt_str, _FIXTURES_FMT)
+    except ValueError:
+        # e.g. a non-English month abbreviation
+        from dateutil import parser as dtparser  # slow import, only needed here
 
+        return dtparser.parse(dt_str)
 
-def _events_from_fixtures(html: str, default_location: str, page_url: str) -> list[Event]:
-    soup = BeautifulSoup(html, "html.parser")
 
-    # Extract text in order, line-by-line
-    text_lines = [ln.strip() for ln in soup.get_text("\n").split("\n")]
-    text_lines = [ln for ln in text_lines if ln]
+def _events_from_fixtures(doc: ParsedDoc, default_location: str, page_url: str) -> list[Event]:
+    # Text in document order, line-by-line
+    text_lines = doc.text_lines
 
-    # Best-effort competition hints from image alt text
-    img_alts = [img.get("alt", "").strip() for img in soup.find_all("img") if img.get("alt")]
+    # Best-effort competition hint from image alt text (page-wide, so look it up once)
+    alt_comp = next((alt for alt in doc.img_alts if alt.lower() in _COMP_MAP), "")
 
     events: list[Event] = []
+    n = len(text_lines)
     i = 0
-    while i < len(text_lines):
+    while i < n:
         ln = text_lines[i]
 
         if _FIXTURES_DT_RE.match(ln):
             dt_str = ln
 
-            # Find the next "Team - Team" line
+            # Find the next "Team - Team" line (within a few lines, and never
+            # past the next fixture's datetime)
             game = ""
+            stop = min(n, i + _FIXTURES_GAME_WINDOW)
             j = i + 1
-            while j < len(text_lines):
-                if " - " in text_lines[j]:
+            while j < stop:
+                if _FIXTURES_DT_RE.match(text_lines[j]):
+                    break
+                if _FIXTURES_GAME_SEP in text_lines[j]:
                     game = text_lines[j]
                     break
                 j += 1
 
             if game:
                 try:
-                    start_dt = dtparser.parse(dt_str)
+                    start_dt = _parse_fixture_dt(dt_str)
                 except Exception:
                     start_dt = None
 
                 if start_dt:
-                    # Add a default duration so Outlook shows a block
-                    end_dt = start_dt + timedelta(hours=2, minutes=30)
+                    end_dt = start_dt + _FIXTURES_DURATION
 
                     # Competition tag best-effort (helps later filtering)
-                    comp = ""
-                    window = " ".join(text_lines[max(0, i-2): min(len(text_lines), i+3)]).lower()
-                    if "champions league" in window:
-                        comp = "Champions League"
-                    elif "league cup" in window:
-                        comp = "League Cup"
-                    elif "fa cup" in window:
-                        comp = "FA Cup"
-
-                    if not comp:
-                        for alt in img_alts:
-                            alt_l = alt.lower()
-                            if alt_l in ("champions league", "league cup", "fa cup"):
-                                comp = alt
-                                break
+                    window = " ".join(text_lines[max(0, i-2): i+3])
+                    found = {m.lower() for m in _COMP_RE.findall(window)}
+                    comp = next((_COMP_MAP[c] for c in _COMP_MAP if c in found), alt_comp)
 
                     title = game if not comp else f"{game} ({comp})"
 
@@ -201,23 +356,26 @@ def _events_from_fixtures(html: str, default_location: str, page_url: str) -> li
                         )
                     )
 
-            i = j if j > i else i + 1
+            # Resume at the game line; if there was none, at the next line
+            i = j if game else i + 1
         else:
             i += 1
 
     return events
 
 
-def _fetch_one(source: Source) -> list[Event]:
-    html = _get(source.url)
+def _parse(source: Source, html: str, doc: ParsedDoc | None = None) -> list[Event]:
+    # doc: html already run through _parse_html_once, if the caller has it
     if not html:
         return []
 
     if "fixtur.es" in source.url:
-        return _events_from_fixtures(html, source.location, source.url)
+        return _events_from_fixtures(doc or _parse_html_once(html), source.location, source.url)
 
-    # Default: stadium sites via JSON-LD
-    return _events_from_jsonld(html, source.location)
+    # Default: stadium sites via JSON-LD (no need to parse a page that has none)
+    if not _JSONLD_MARKER_RE.search(html):
+        return []
+    return _events_from_jsonld(doc or _parse_html_once(html), source.location)
 
 
 def fetch_events(sources: Source | Iterable[Source]) -> dict[Source, list[Event]] | list[Event]:
@@ -225,11 +383,66 @@ def fetch_events(sources: Source | Iterable[Source]) -> dict[Source, list[Event]
     Supports BOTH call styles:
       - fetch_events(source) -> list[Event]
       - fetch_events([source1, source2, ...]) -> dict[Source, list[Event]]
+
+    Multiple sources are downloaded in parallel (up to MAX_FETCH_WORKERS at once);
+    each page is parsed as soon as its download completes. Sources sharing a
+    URL share one download and one HTML parse. Pages that are unchanged since
+    the last run (HTTP 304, or an identical body) reuse the events parsed then.
     """
     if isinstance(sources, Source):
-        return _fetch_one(sources)
+        return fetch_events([sources])[sources]
 
+    src_list = list(sources)
     result: dict[Source, list[Event]] = {}
-    for s in sources:
-        result[s] = _fetch_one(s)
-    return result
+    if not src_list:
+        return result
+
+    by_url: dict[str, list[Source]] = {}
+    for s in src_list:
+        by_url.setdefault(s.url, []).append(s)
+
+    cache = httpcache.load_cache()
+
+    with ThreadPoolExecutor(max_workers=min(MAX_FETCH_WORKERS, len(by_url))) as ex:
+        locations = {
+            url: {httpcache.source_key(s.stadium_tag, s.name): s.location for s in group}
+            for url, group in by_url.items()
+        }
+        futures = {ex.submit(_get, url, cache, locations[url]): url for url in by_url}
+        for f in as_completed(futures):
+            url = futures[f]
+            group = by_url[url]
+            html, from_cache = f.result()
+
+            cached: dict[Source, list[Event] | None] = {}
+            if from_cache:
+                cached = {
+                    s: httpcache.cached_events(cache, url, httpcache.source_key(s.stadium_tag, s.name))
+                    for s in group
+                }
+                if any(events is None for events in cached.values()):
+                    # 304, but the cached events are unusable: download the page in full
+                    html, _ = _get(url, cache, locations[url], revalidate=False)
+                    cached = {}
+
+            doc: ParsedDoc | None = None
+
+            for s in group:
+                events = cached.get(s)
+                if events is None and html:
+                    key = httpcache.body_key(html, s.location, s.url)
+                    events = httpcache.load_parsed(s.stadium_tag, s.name, key)
+                    if events is None:
+                        if doc is None and len(group) > 1:
+                            doc = _parse_html_once(html)
+                        events = _parse(s, html, doc)
+                        httpcache.save_parsed(s.stadium_tag, s.name, key, events)
+                    httpcache.store_events(
+                        cache, url, httpcache.source_key(s.stadium_tag, s.name), s.location, events
+                    )
+                result[s] = events or []
+
+    httpcache.save_cache(cache)
+
+    # Keep the caller's source order regardless of completion order
+    return {s: result[s] for s in src_list}